@@ -1,4 +1,6 @@
 from vima_bench import make
+from vima_bench.env.action_sampler import make_action_sampler
+import numpy as np
 import pybullet as p
 import time
 
@@ -10,14 +12,17 @@ STEPS = 250          # how many steps to run
 SLEEP = 0.05         # speed (smaller = faster)
 CAM_DIST = 0.45      # camera distance from gripper marker
 CAM_PITCH = -25      # camera pitch angle
+CAM_UPDATE_EVERY = 4 # orbit-camera update period (steps); cuts GUI overhead
 
 def pick_robot_body():
-    """Pick the body most likely to be the robot: max joints, fallback max visuals."""
+    """Pick the body most likely to be the robot: max joints."""
     nb = p.getNumBodies()
-    joint_counts = [(bid, p.getNumJoints(bid)) for bid in range(nb)]
-    joint_counts.sort(key=lambda x: x[1], reverse=True)
-    best_bid, best_j = joint_counts[0]
-    return best_bid
+    # Single argmax — no intermediate list or O(N log N) sort.
+    return max(range(nb), key=p.getNumJoints)
+
+# End-effector name keywords, kept as bytes so joint/link names from PyBullet
+# can be matched without a per-joint UTF-8 decode + str allocation.
+EE_KEYWORDS = (b"gripper", b"finger", b"ee", b"tool", b"tcp", b"tip", b"hand")
 
 def pick_ee_link(robot_id: int):
     """Pick an end-effector link index using name heuristics; fallback to last joint."""
@@ -25,16 +30,13 @@ def pick_ee_link(robot_id: int):
     if nJ <= 0:
         return None
 
-    keywords = ["gripper", "finger", "ee", "tool", "tcp", "tip", "hand"]
     candidates = []
     for j in range(nJ):
         info = p.getJointInfo(robot_id, j)
-        jname = (info[1] or b"").decode("utf-8", "ignore").lower()
-        lname = (info[12] or b"").decode("utf-8", "ignore").lower()
-        score = 0
-        for k in keywords:
-            if k in jname: score += 2
-            if k in lname: score += 2
+        jname = info[1].lower() if info[1] else b""
+        lname = info[12].lower() if info[12] else b""
+        score = sum(2 for k in EE_KEYWORDS if k in jname)
+        score += sum(2 for k in EE_KEYWORDS if k in lname)
         # Prefer later links slightly
         score += j / max(1, nJ-1)
         candidates.append((score, j, jname, lname))
@@ -73,11 +75,15 @@ def main():
 
     marker = make_marker(radius=0.03, rgba=(0, 1, 0, 1))
 
+    sample_action = make_action_sampler(env.action_space)
+
     # Main loop: step env, move marker to EE, auto-orbit camera
     yaw = 30.0
+    last_ee_pos = np.full(3, np.inf)
+    next_t = time.perf_counter()
     for i in range(STEPS):
         # Step with random action to force motion attempts
-        a = env.action_space.sample()
+        a = sample_action()
         obs, reward, done, info = env.step(a)
 
         # Update marker position to EE
@@ -85,22 +91,41 @@ def main():
             ee_state = p.getLinkState(robot_id, ee)
             if ee_state is not None:
                 ee_pos = ee_state[0]
-                p.resetBasePositionAndOrientation(marker, ee_pos, [0, 0, 0, 1])
 
-                # Auto camera orbit around EE marker so you can ALWAYS see it
+                # Skip the debug round-trip when the EE barely moved (>1e-4)
+                delta = np.subtract(ee_pos, last_ee_pos)
+                if delta.dot(delta) > 1e-8:
+                    p.resetBasePositionAndOrientation(marker, ee_pos, [0, 0, 0, 1])
+                    last_ee_pos[:] = ee_pos
+
+                # Auto camera orbit around EE marker so you can ALWAYS see it;
+                # updating every few steps is visually indistinguishable but
+                # cuts the GUI-renderer calls by the throttle factor.
                 yaw += 0.8
-                p.resetDebugVisualizerCamera(
-                    cameraDistance=CAM_DIST,
-                    cameraYaw=yaw,
-                    cameraPitch=CAM_PITCH,
-                    cameraTargetPosition=ee_pos
-                )
+                if i % CAM_UPDATE_EVERY == 0:
+                    p.resetDebugVisualizerCamera(
+                        cameraDistance=CAM_DIST,
+                        cameraYaw=yaw,
+                        cameraPitch=CAM_PITCH,
+                        cameraTargetPosition=ee_pos
+                    )
 
         if done:
             print(f"Episode ended at step {i} (normal for random actions). Resetting...")
             env.reset()
 
-        time.sleep(SLEEP)
+        # Frame-accurate pacing: advance a fixed deadline and sleep only the
+        # remainder, so slow sim steps shrink the sleep instead of letting
+        # the step rate drift with sleep jitter.
+        next_t += SLEEP
+        dt = next_t - time.perf_counter()
+        if dt > 0:
+            time.sleep(dt)
+        else:
+            # A stall longer than one period (GUI drag, reset) must not turn
+            # into a full-speed sprint while the deficit drains; restart the
+            # deadline from now.
+            next_t = time.perf_counter()
 
     print("Done. Closing.")
     env.close()
@@ -3,6 +3,8 @@ import numpy as np
 import pybullet as p
 
 from vima_bench import make
+from vima_bench.env.action_sampler import make_action_sampler
+from vima_bench.env.body_snapshot import DEMO_IGNORE_RE, TOOL_RE, snapshot_bodies
 from vima_bench.env.wrappers.audio_identity import AudioIdentityWrapper
 
 # -------------------------
@@ -25,28 +27,55 @@ env = make(
 obs = env.reset()
 
 # -------------------------
-# Inspect bodies + auto-detect tool/ignore/objects
+# Body scan (cached per reset)
 # -------------------------
-print("\nBODY LIST:")
-tool_ids = []
-ignore_bodies = set()
-object_ids = []
+# Masses and names never change between resets, so one scan per reset is
+# enough; repeat calls reuse the cached result instead of re-querying
+# PyBullet per body.
+_body_scan_cache = {}
+_reset_counter = 0
+
+
+def mark_reset():
+    """Invalidate the cached body scan after a scene rebuild."""
+    global _reset_counter
+    _reset_counter += 1
+
 
-for i in range(p.getNumBodies()):
-    mass = p.getDynamicsInfo(i, -1)[0]
-    name = p.getBodyInfo(i)[1].decode("utf-8", errors="ignore")
-    lname = name.lower()
+def scan_bodies():
+    """Classify bodies into tools / ignored clutter / dynamic objects."""
+    key = _reset_counter
+    if key in _body_scan_cache:
+        return _body_scan_cache[key]
 
-    print(f" {i:2d} | mass={mass:.4f} | {name}")
+    tool_ids = []
+    ignore_bodies = set()
+    object_ids = []
 
-    if mass == 0 or "line.urdf" in lname or "workspace" in lname or "ur5" in lname or "plane" in lname:
-        ignore_bodies.add(i)
+    # Single getDynamicsInfo+getBodyInfo pass per body via the shared helper;
+    # every classification below runs over the snapshot.
+    for i, mass, lname in snapshot_bodies():
+        print(f" {i:2d} | mass={mass:.4f} | {lname}")
 
-    if "spatula" in lname or "suction" in lname or "gripper" in lname:
-        tool_ids.append(i)
+        # ignore common static clutter + boundaries
+        if mass == 0 or DEMO_IGNORE_RE.search(lname):
+            ignore_bodies.add(i)
 
-    if mass > 0 and not ("spatula" in lname or "suction" in lname or "gripper" in lname):
-        object_ids.append(i)
+        # tool detection
+        is_tool = TOOL_RE.search(lname) is not None
+        if is_tool:
+            tool_ids.append(i)
+
+        # candidate objects: dynamic bodies that are not tools
+        if mass > 0 and not is_tool:
+            object_ids.append(i)
+
+    _body_scan_cache[key] = (tool_ids, ignore_bodies, object_ids)
+    return _body_scan_cache[key]
+
+
+print("\nBODY LIST:")
+tool_ids, ignore_bodies, object_ids = scan_bodies()
 
 print("\nAUTO-DETECTED:")
 print(" tool_ids:", tool_ids)
@@ -75,75 +104,12 @@ env = AudioIdentityWrapper(
 )
 
 # -------------------------
-# TRIMODAL PROMPT (do NOT assign; prompt may be read-only)
-# -------------------------
-trimodal_prompt = (
-    "Sweep ONLY objects with sound token <AUD_TING>. "
-    "Avoid objects with sound token <AUD_THUD>."
-)
-
-print("\n=== PROMPT ===")
-print("TEXT:", trimodal_prompt)
-print("AUDIO MAP:", object_sound_map)
-print("VISION: PyBullet GUI with UR5 arm")
-
-# -------------------------
-# Inspect bodies (for transparency)
-# -------------------------
-# -------------------------
-# Inspect bodies + auto-detect tool/ignore/objects
-# -------------------------
-print("\nBODY LIST:")
-tool_ids = []
-ignore_bodies = set()
-object_ids = []
-
-for i in range(p.getNumBodies()):
-    mass = p.getDynamicsInfo(i, -1)[0]
-    name = p.getBodyInfo(i)[1].decode("utf-8", errors="ignore")
-    lname = name.lower()
-
-    print(f" {i:2d} | mass={mass:.4f} | {name}")
-
-    # ignore common static clutter + boundaries
-    if mass == 0 or "line.urdf" in lname or "workspace" in lname or "ur5" in lname or "plane" in lname:
-        ignore_bodies.add(i)
-
-    # tool detection
-    if "spatula" in lname or "suction" in lname or "gripper" in lname:
-        tool_ids.append(i)
-
-    # candidate objects: dynamic bodies that are not tools
-    if mass > 0 and not ("spatula" in lname or "suction" in lname or "gripper" in lname):
-        object_ids.append(i)
-
-print("\nAUTO-DETECTED:")
-print(" tool_ids:", tool_ids)
-print(" ignore_bodies:", sorted(ignore_bodies))
-print(" object_ids:", object_ids)
-
-# -------------------------
-# AUDIO DEFINES IDENTITY (auto assign)
-# -------------------------
-# Rule: first object(s) are targets, second is silent, rest targets (simple demo)
+# Single reset through the wrapper (builds per-episode audio state).
+# The first reset above was only needed so the body scan sees a populated
+# scene — no other resets, each one rebuilds the whole simulation.
 # -------------------------
-# AUDIO DEFINES IDENTITY (2 objects)
-# -------------------------
-object_sound_map = {}
-if len(object_ids) >= 1:
-    object_sound_map[object_ids[0]] = "tingting"  # Object A
-if len(object_ids) >= 2:
-    object_sound_map[object_ids[1]] = "thud"      # Object B (different)
-# if more objects exist in other tasks, you can extend:
-for oid in object_ids[2:]:
-    object_sound_map[oid] = "alarm"
-
-
-# BASELINE (NO AUDIO WRAPPER)
-# Keep env as-is
-
-
 obs = env.reset()
+mark_reset()
 
 # -------------------------
 # TRIMODAL PROMPT
@@ -175,68 +141,86 @@ print("VISION: PyBullet GUI with UR5 arm")
 # -------------------------
 print("\nStarting demo...")
 
-action_space = env.action_space
-
-for step in range(TOTAL_STEPS):
-    if step < 50:
-# valid action for VIMA: Dict with 2 XY poses + quaternions
-        action = action_space.sample()
-
-# OPTIONAL: make rotation stable (identity quaternion)
-        action["pose0_rotation"] = np.array([0, 0, 0, 1], dtype=np.float32)
-        action["pose1_rotation"] = np.array([0, 0, 0, 1], dtype=np.float32)
-    else:
-        action = action_space.sample()
-
-    obs, r, d, info = env.step(action)
-    # (keep your audio_vec block after this)
+sample_action = make_action_sampler(env.action_space)
 
 # -------------------------
 # AUDIO -> OBS (vector)
 # -------------------------
-emb_dim = info.get("audio_emb_dim", 128)
-audio_vec = np.zeros((emb_dim,), dtype=np.float32)
+# Allocate the audio vector once and overwrite it in place when a new event
+# arrives — no per-step np.zeros/np.array churn. 128 matches the wrapper's
+# default emb_dim. Embeddings from info are lists; convert each object's
+# embedding to float32 once, on first use.
+audio_vec = np.zeros((128,), dtype=np.float32)
+emb_cache = {}            # object_id -> float32 ndarray
+last_event_count = 0
+printed_first_audio = False
 
-events = info.get("audio_events", [])
-emb_map = info.get("audio_obj_emb", {})
-
-# If there is at least one audio event, use the most recent event's object embedding
-if len(events) > 0:
-    last = events[-1]                  # most recent event
-    obj_id = last["object_id"]
-    if obj_id in emb_map:
-        audio_vec = np.array(emb_map[obj_id], dtype=np.float32)
+next_t = time.perf_counter()
+for step in range(TOTAL_STEPS):
+    # valid action for VIMA: Dict with 2 XY poses + quaternions
+    action = sample_action()
+    if step < 50:
+        # OPTIONAL: make rotation stable (identity quaternion) — write in
+        # place, the sampler's buffers are reused across steps
+        action["pose0_rotation"][:] = (0, 0, 0, 1)
+        action["pose1_rotation"][:] = (0, 0, 0, 1)
 
-# attach audio vector into observation (new modality)
-if isinstance(obs, dict):
-    obs["audio_vec"] = audio_vec
+    obs, r, d, info = env.step(action)
 
-# one-time print when audio starts happening (AFTER audio_vec is filled)
-if (not hasattr(env, "_printed_first_audio")) and len(events) > 0:
-    env._printed_first_audio = True
-    print("FIRST AUDIO EVENT:", events[0])
-    print("audio_vec sum after first event:", float(audio_vec.sum()))
+    # If a new audio event arrived, use the most recent event's object
+    # embedding. Detect via the running counter, not len(audio_events):
+    # the event history is a capped deque, so its length pins at the cap
+    # on long runs while the counter keeps growing.
+    event_count = info.get("audio_event_count", 0)
+    if event_count > last_event_count:
+        last_event_count = event_count
+        events = info.get("audio_events", ())
+        last = events[-1]                  # most recent event
+        obj_id = last.object_id
+        emb = emb_cache.get(obj_id)
+        if emb is None:
+            raw = info.get("audio_obj_emb", {}).get(obj_id)
+            if raw is not None:
+                emb = emb_cache[obj_id] = np.asarray(raw, dtype=np.float32)
+        if emb is not None:
+            np.copyto(audio_vec, emb)
+
+        # one-time print when audio starts happening (AFTER audio_vec is filled)
+        if not printed_first_audio:
+            printed_first_audio = True
+            print("FIRST AUDIO EVENT:", events[0])
+            print("audio_vec sum after first event:", float(audio_vec.sum()))
+
+    # attach audio vector into observation (new modality)
+    if isinstance(obs, dict):
+        obs["audio_vec"] = audio_vec
 
     # quick sanity print once
-
     if step == 0:
-        emb = info.get("audio_obj_emb", {})
+        emb_map = info.get("audio_obj_emb", {})
         print("audio_emb_dim:", info.get("audio_emb_dim"))
-        print("audio_obj_emb keys:", list(emb.keys()))
-        if emb:
-            k0 = list(emb.keys())[0]
-            print("sample emb len:", len(emb[k0]), "first 5:", emb[k0][:5])
-    if step == 0:
+        print("audio_obj_emb keys:", list(emb_map.keys()))
+        if emb_map:
+            k0 = next(iter(emb_map))
+            print("sample emb len:", len(emb_map[k0]), "first 5:", emb_map[k0][:5])
         print("obs has audio_vec:", isinstance(obs, dict) and "audio_vec" in obs)
 
-
     if step % 50 == 0:
-        print("info keys:", list(info.keys()), "| audio_events:", len(info.get("audio_events", [])))
-
-    time.sleep(STEP_DELAY)
+        print("info keys:", list(info.keys()), "| audio_events:", info.get("audio_event_count", 0))
+
+    # Frame-accurate pacing: advance a fixed deadline and sleep only the
+    # remainder, so slow sim steps shrink the sleep instead of letting the
+    # step rate drift with sleep jitter.
+    next_t += STEP_DELAY
+    dt = next_t - time.perf_counter()
+    if dt > 0:
+        time.sleep(dt)
+    else:
+        # A stall longer than one period (GUI drag, slow step) must not turn
+        # into a full-speed sprint while the deficit drains; restart the
+        # deadline from now.
+        next_t = time.perf_counter()
 
 print("\n=== DEMO FINISHED ===")
-print("Audio events:", len(info.get("audio_events", [])))
-env.close()
-
+print("Audio events:", info.get("audio_event_count", 0))
 env.close()
@@ -7,12 +7,14 @@
 import argparse
 import csv
 import os
-import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 import numpy as np
 import pybullet as p
 from vima_bench import make
+from vima_bench.env.action_bounds import pack_action_bounds
+from vima_bench.env.body_snapshot import EVAL_IGNORE_RE, snapshot_bodies
 from vima_bench.env.wrappers.audio_identity import AudioIdentityWrapper
 
 TASK = "constraint_satisfaction/sweep_without_exceeding"
@@ -31,42 +33,23 @@ OUT_PATH = os.path.join(
 SOUND_LABELS = ["tingting", "thud", "alarm"]  # cycle through these
 SILENT_FRACTION = 0.33  # fraction of objects that will be silent (None)
 
-def set_global_seed(seed: int):
-    random.seed(seed)
-    np.random.seed(seed)
-
-def get_body_name(bid: int) -> str:
-    try:
-        return (p.getBodyInfo(bid)[1] or b"").decode("utf-8", "ignore")
-    except Exception:
-        return ""
-
 def detect_robot_body() -> int:
     """Heuristic: robot usually has the most joints."""
     nb = p.getNumBodies()
-    best, best_j = 0, -1
-    for bid in range(nb):
-        try:
-            nj = p.getNumJoints(bid)
-            if nj > best_j:
-                best, best_j = bid, nj
-        except Exception:
-            pass
-    return best
-
-def build_object_sound_map(ignore_bodies: set, tool_bodies: set):
+    if nb == 0:
+        return 0
+    # Single argmax over the C-level joint counts; no per-body try/except.
+    return max(range(nb), key=p.getNumJoints)
+
+def build_object_sound_map(body_snapshot: list, ignore_bodies: set, tool_bodies: set):
     """
     Build a mapping of dynamic object bodies -> sound label or None (silent).
     We treat: mass>0 bodies as candidate objects, excluding known ignore/tool bodies.
     """
     candidates = []
-    for bid in range(p.getNumBodies()):
+    for bid, mass, _ in body_snapshot:
         if bid in ignore_bodies or bid in tool_bodies:
             continue
-        try:
-            mass = p.getDynamicsInfo(bid, -1)[0]
-        except Exception:
-            continue
         if mass and mass > 0:
             candidates.append(bid)
 
@@ -88,23 +71,45 @@ def build_object_sound_map(ignore_bodies: set, tool_bodies: set):
 
     return obj_map, candidates
 
-def run_episode(seed: int):
-    set_global_seed(seed)
+# One wrapped env per process, built lazily and reused across that process's
+# episodes — make() reloads URDFs and rebuilds the physics world, by far the
+# dominant per-episode setup cost.
+_WORKER_ENV = None
+
+def _get_env():
+    global _WORKER_ENV
+    if _WORKER_ENV is None:
+        base_env = make(task_name=TASK, display_debug_window=False)
+        _WORKER_ENV = AudioIdentityWrapper(
+            base_env,
+            object_sound_map={},
+            debug=False,
+            terminate_on_silent_touch=True,
+            silent_penalty=-1.0,
+        )
+    return _WORKER_ENV
 
-    base_env = make(task_name=TASK, display_debug_window=False)
+def run_episode(seed: int):
+    # env.seed(seed) below is the simulator's own seeding API; nothing here
+    # draws from the global RNGs, so they stay untouched (which also keeps
+    # the process-pool workers' seeding explicit and independent).
+    env = _get_env()
+    base_env = env.env
     base_env.seed(seed)
     obs = base_env.reset()
 
     task = base_env.task
     oracle_fn = task.oracle(base_env)
 
+    # Snapshot body metadata once per episode; reused by all classification passes.
+    body_snapshot = snapshot_bodies()
+
     # Identify bodies to ignore and tool bodies
     ignore_bodies = set()
     tool_bodies = set()
 
-    for bid in range(p.getNumBodies()):
-        name = get_body_name(bid).lower()
-        if any(k in name for k in ["plane", "ground", "table", "workspace"]):
+    for bid, _, name in body_snapshot:
+        if EVAL_IGNORE_RE.search(name):
             ignore_bodies.add(bid)
 
     robot_id = detect_robot_body()
@@ -112,28 +117,34 @@ def run_episode(seed: int):
     tool_bodies.add(robot_id)
 
     object_sound_map, dynamic_objects = build_object_sound_map(
-        ignore_bodies, tool_bodies
+        body_snapshot, ignore_bodies, tool_bodies
     )
 
-    env = AudioIdentityWrapper(
-        base_env,
-        object_sound_map=object_sound_map,
-        debug=False,
-        ignore_bodies=ignore_bodies,
-        tool_bodies=tool_bodies,
-        terminate_on_silent_touch=True,
-        silent_penalty=-1.0,
+    # Rebind per-episode audio state on the reused wrapper. No extra reset:
+    # the scene we just scanned is the one this episode runs in.
+    env.set_object_sound_map(
+        object_sound_map, ignore_bodies=ignore_bodies, tool_bodies=tool_bodies
     )
 
-    obs = env.reset()
-
     success = False
     failure = False
     terminated_reason = ""
     audio_event_count = 0
 
-    for t in range(1, min(MAX_STEPS, task.oracle_max_steps) + 1):
-        oracle_action = oracle_fn.act(obs)
+    # Action bounds are invariant for the episode; pack them once so each
+    # step clips the whole action in a single vectorized call.
+    layout, lows, highs = pack_action_bounds(env.action_space)
+
+    # Loop invariants: compute the step limit once and bind the hot
+    # callables to locals (25k iterations per sweep pay for the attribute
+    # lookups otherwise). Termination is checked before the next oracle
+    # call, so a terminal step never pays for one more plan.
+    max_steps = min(MAX_STEPS, task.oracle_max_steps)
+    act = oracle_fn.act
+    env_step = env.step
+
+    for t in range(1, max_steps + 1):
+        oracle_action = act(obs)
         if oracle_action is None:
             # Oracle sometimes fails (e.g., target not visible). Don’t crash the run.
             failure = True
@@ -141,24 +152,25 @@ def run_episode(seed: int):
             break
 
 
-        oracle_action = {
-            k: np.clip(v, env.action_space[k].low, env.action_space[k].high)
-            for k, v in oracle_action.items()
-        }
+        flat = np.concatenate([np.ravel(oracle_action[k]) for k, _, _ in layout])
+        np.clip(flat, lows, highs, out=flat)
+        for k, sl, shape in layout:
+            oracle_action[k] = flat[sl].reshape(shape)
 
-        obs, reward, done, info = env.step(oracle_action)
+        obs, reward, done, info = env_step(oracle_action)
 
         success = bool(info.get("success", False))
         failure = bool(info.get("failure", False))
         terminated_reason = str(info.get("terminated_reason", ""))
 
-        audio_events = info.get("audio_events", [])
-        audio_event_count = len(audio_events) if isinstance(audio_events, list) else 0
+        # The wrapper maintains a running integer count — no need to pull the
+        # event list out of info just to len() it every step.
+        audio_event_count = info.get("audio_event_count", 0)
 
         if done or success or failure:
             break
 
-    env.close()
+    # env stays open for the next seed handled by this process
 
     return {
         "seed": seed,
@@ -172,11 +184,20 @@ def run_episode(seed: int):
         "num_silent_objects": sum(1 for v in object_sound_map.values() if v is None),
     }
 
+def _worker_init(task: str):
+    """Configure a pool worker: pin config globals and keep BLAS single-threaded."""
+    # Each worker runs its own single-threaded DIRECT client; don't let BLAS
+    # oversubscribe the cores the other workers are using.
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    global TASK
+    TASK = task
+
 def parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("--task", type=str, default=TASK)
     p.add_argument("--episodes", type=int, default=N_EPISODES)
     p.add_argument("--seed", type=int, default=BASE_SEED)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
     return p.parse_args()
 
 
@@ -193,26 +214,58 @@ def main():
 
     os.makedirs(OUT_DIR, exist_ok=True)
 
-    rows = []
+    fieldnames = [
+        "episode", "seed", "success", "failure", "steps", "terminated_reason",
+        "compliant", "audio_events", "num_dynamic_objects", "num_silent_objects",
+    ]
+
     success_count = 0
     compliant_count = 0
+    audio_events_sum = 0
+    episodes_done = 0
 
-    for i, seed in enumerate(SEEDS, start=1):
-        row = run_episode(seed)
-        rows.append({"episode": i, **row})
-
-        success_count += row["success"]
-        compliant_count += row["compliant"]
+    # Stream rows to disk as episodes finish: bounded memory, and a crash at
+    # episode 95/100 doesn't lose the first 94 rows. The flush also lets you
+    # tail the CSV during long sweeps.
+    with open(OUT_PATH, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
 
-        print(
-            f"[Audio-VIMA] ep={i}/{N_EPISODES} seed={seed} "
-            f"success={bool(row['success'])} compliant={bool(row['compliant'])} "
-            f"reason={row['terminated_reason'] or '-'} steps={row['steps']}"
-        )
+        def record(i: int, row: dict):
+            nonlocal success_count, compliant_count, audio_events_sum, episodes_done
+            writer.writerow({"episode": i, **row})
+            f.flush()
+
+            success_count += row["success"]
+            compliant_count += row["compliant"]
+            audio_events_sum += row["audio_events"]
+            episodes_done += 1
+
+            print(
+                f"[Audio-VIMA] ep={i}/{N_EPISODES} seed={row['seed']} "
+                f"success={bool(row['success'])} compliant={bool(row['compliant'])} "
+                f"reason={row['terminated_reason'] or '-'} steps={row['steps']}"
+            )
+
+        # Episodes are independent (each builds its own DIRECT client), so fan
+        # them out across processes; ex.map keeps results in seed order.
+        if args.workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=args.workers,
+                initializer=_worker_init,
+                initargs=(TASK,),
+            ) as ex:
+                for i, row in enumerate(ex.map(run_episode, SEEDS, chunksize=1), start=1):
+                    record(i, row)
+        else:
+            for i, seed in enumerate(SEEDS, start=1):
+                record(i, run_episode(seed))
+            if _WORKER_ENV is not None:
+                _WORKER_ENV.close()
 
     success_rate = 100.0 * success_count / N_EPISODES
     compliance_rate = 100.0 * compliant_count / N_EPISODES
-    avg_audio_events = float(np.mean([r["audio_events"] for r in rows])) if rows else 0.0
+    avg_audio_events = audio_events_sum / episodes_done if episodes_done else 0.0
 
     print("\n=== AUDIO-VIMA SUMMARY ===")
     print(f"Task: {TASK}")
@@ -223,11 +276,5 @@ def main():
     print(f"Avg Audio Events/Episode: {avg_audio_events:.2f}")
     print(f"CSV: {OUT_PATH}")
 
-
-    with open(OUT_PATH, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-        writer.writeheader()
-        writer.writerows(rows)
-
 if __name__ == "__main__":
     main()
@@ -6,11 +6,12 @@
 import argparse
 import csv
 import os
-import random
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 import numpy as np
 from vima_bench import make
+from vima_bench.env.action_bounds import pack_action_bounds
 
 TASK = "constraint_satisfaction/sweep_without_exceeding"
 
@@ -26,12 +27,29 @@ OUT_PATH = os.path.join(
     OUT_DIR, f"baseline_{TASK.replace('/','_')}_{N_EPISODES}eps_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
 )
 
-def set_global_seed(seed: int):
-    random.seed(seed)
-    np.random.seed(seed)
-
-def run_episode(env, seed: int):
-    set_global_seed(seed)
+# One env per process, built lazily and reused across that worker's episodes
+# (env construction loads URDFs and is far more expensive than a reset).
+_WORKER_ENV = None
+
+def _worker_init(task: str):
+    """Configure a pool worker: pin config globals and keep BLAS single-threaded."""
+    # Each worker runs its own single-threaded DIRECT client; don't let BLAS
+    # oversubscribe the cores the other workers are using.
+    os.environ.setdefault("OMP_NUM_THREADS", "1")
+    global TASK
+    TASK = task
+
+def _get_env():
+    global _WORKER_ENV
+    if _WORKER_ENV is None:
+        _WORKER_ENV = make(task_name=TASK, display_debug_window=False)
+    return _WORKER_ENV
+
+def run_episode(seed: int):
+    env = _get_env()
+    # env.seed(seed) is the simulator's own seeding API; nothing here draws
+    # from the global RNGs, so they stay untouched (which also keeps the
+    # process-pool workers' seeding explicit and independent).
     env.seed(seed)
 
     obs = env.reset()
@@ -41,18 +59,30 @@ def run_episode(env, seed: int):
     success = False
     failure = False
 
-    for t in range(1, min(MAX_STEPS, task.oracle_max_steps) + 1):
-        oracle_action = oracle_fn.act(obs)
+    # Action bounds are invariant for the episode; pack them once so each
+    # step clips the whole action in a single vectorized call.
+    layout, lows, highs = pack_action_bounds(env.action_space)
+
+    # Loop invariants: compute the step limit once and bind the hot
+    # callables to locals (25k iterations per sweep pay for the attribute
+    # lookups otherwise). Termination is checked before the next oracle
+    # call, so a terminal step never pays for one more plan.
+    max_steps = min(MAX_STEPS, task.oracle_max_steps)
+    act = oracle_fn.act
+    env_step = env.step
+
+    for t in range(1, max_steps + 1):
+        oracle_action = act(obs)
         if oracle_action is None:
             # Oracle sometimes fails (e.g., target not visible). Treat as failure and stop episode.
             failure = True
             break
 
-        oracle_action = {
-            k: np.clip(v, env.action_space[k].low, env.action_space[k].high)
-            for k, v in oracle_action.items()
-        }
-        obs, reward, done, info = env.step(action=oracle_action, skip_oracle=False)
+        flat = np.concatenate([np.ravel(oracle_action[k]) for k, _, _ in layout])
+        np.clip(flat, lows, highs, out=flat)
+        for k, sl, shape in layout:
+            oracle_action[k] = flat[sl].reshape(shape)
+        obs, reward, done, info = env_step(action=oracle_action, skip_oracle=False)
 
         success = bool(info.get("success", False))
         failure = bool(info.get("failure", False))
@@ -61,11 +91,14 @@ def run_episode(env, seed: int):
             break
 
     return success, t, failure
+
+
 def parse_args():
     p = argparse.ArgumentParser()
     p.add_argument("--task", type=str, default=TASK)
     p.add_argument("--episodes", type=int, default=N_EPISODES)
     p.add_argument("--seed", type=int, default=BASE_SEED)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
     return p.parse_args()
 
 
@@ -88,26 +121,49 @@ def main():
     print("=" * 60 + "\n")
 
 
-    env = make(task_name=TASK, display_debug_window=False)
-
-    rows = []
     success_count = 0
 
-    for i, seed in enumerate(SEEDS, start=1):
-        success, steps, failure = run_episode(env, seed)
-        success_count += int(success)
-
-        rows.append({
-            "episode": i,
-            "seed": seed,
-            "success": int(success),
-            "failure": int(failure),
-            "steps": steps,
-        })
+    # Stream rows to disk as episodes finish: bounded memory, and a crash at
+    # episode 95/100 doesn't lose the first 94 rows. The flush also lets you
+    # tail the CSV during long sweeps.
+    with open(OUT_PATH, "w", newline="") as f:
+        writer = csv.DictWriter(
+            f, fieldnames=["episode", "seed", "success", "failure", "steps"]
+        )
+        writer.writeheader()
 
-        print(f"[Baseline] ep={i}/{N_EPISODES} seed={seed} success={success} steps={steps}")
+        def record(i: int, seed: int, result):
+            nonlocal success_count
+            success, steps, failure = result
+            success_count += int(success)
+
+            writer.writerow({
+                "episode": i,
+                "seed": seed,
+                "success": int(success),
+                "failure": int(failure),
+                "steps": steps,
+            })
+            f.flush()
+
+            print(f"[Baseline] ep={i}/{N_EPISODES} seed={seed} success={success} steps={steps}")
+
+        # Episodes are independent, so fan them out across processes; each worker
+        # holds one env across its assigned seeds. ex.map keeps seed order.
+        if args.workers > 1:
+            with ProcessPoolExecutor(
+                max_workers=args.workers,
+                initializer=_worker_init,
+                initargs=(TASK,),
+            ) as ex:
+                for i, result in enumerate(ex.map(run_episode, SEEDS, chunksize=1), start=1):
+                    record(i, SEEDS[i - 1], result)
+        else:
+            for i, seed in enumerate(SEEDS, start=1):
+                record(i, seed, run_episode(seed))
+            if _WORKER_ENV is not None:
+                _WORKER_ENV.close()
 
-    env.close()
     success_rate = 100.0 * success_count / N_EPISODES
 
     print("\n=== BASELINE SUMMARY ===")
@@ -117,11 +173,5 @@ def main():
     print(f"Success Rate: {success_rate:.2f}%")
     print(f"CSV: {OUT_PATH}")
 
-
-    with open(OUT_PATH, "w", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
-        writer.writeheader()
-        writer.writerows(rows)
-
 if __name__ == "__main__":
     main()
@@ -1,3 +1,4 @@
+import csv
 import glob
 import os
 import re
@@ -22,9 +23,29 @@ def load_one(path):
     if not m:
         return None
     kind, task_slug, eps, ts = m.group(1), m.group(2), int(m.group(3)), m.group(4)
-    df = pd.read_csv(path)
-    # success column exists in both
-    success_rate = 100.0 * df["success"].mean() if "success" in df.columns else None
+
+    # Stream the file with csv.DictReader and keep running sums — we only
+    # need three means, so skip the per-file DataFrame build + type inference.
+    n = 0
+    success_sum = 0
+    compliant_sum = 0
+    audio_events_sum = 0.0
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        has_success = "success" in fields
+        has_compliant = "compliant" in fields
+        has_audio = "audio_events" in fields
+        for row in reader:
+            n += 1
+            if has_success:
+                success_sum += int(row["success"])
+            if has_compliant:
+                compliant_sum += int(row["compliant"])
+            if has_audio:
+                audio_events_sum += float(row["audio_events"])
+
+    success_rate = 100.0 * success_sum / n if (has_success and n) else None
 
     out = {
         "kind": kind,
@@ -35,11 +56,11 @@ def load_one(path):
         "success_rate": round(success_rate, 2) if success_rate is not None else None,
     }
 
-    if kind == "audiovima":
-        if "compliant" in df.columns:
-            out["compliance_rate"] = round(100.0 * df["compliant"].mean(), 2)
-        if "audio_events" in df.columns:
-            out["avg_audio_events"] = round(float(df["audio_events"].mean()), 2)
+    if kind == "audiovima" and n:
+        if has_compliant:
+            out["compliance_rate"] = round(100.0 * compliant_sum / n, 2)
+        if has_audio:
+            out["avg_audio_events"] = round(audio_events_sum / n, 2)
 
     return out
 
@@ -0,0 +1,25 @@
+"""Packed action-space bounds shared by the evaluator scripts.
+
+Clipping an oracle action key-by-key issues one tiny ``np.clip`` per
+subspace, and NumPy dispatch overhead dominates for 2-4 element arrays.
+``pack_action_bounds`` flattens the Dict space's bounds once so the whole
+action clips in a single vectorized call.
+"""
+import numpy as np
+
+
+def pack_action_bounds(action_space):
+    """
+    Concatenate all Box lows/highs into two flat ndarrays (plus per-key
+    slices/shapes) so the whole action is clipped with one vectorized
+    np.clip call instead of K tiny ones.
+    """
+    layout = []
+    start = 0
+    for k, sp in action_space.spaces.items():
+        n = sp.low.size
+        layout.append((k, slice(start, start + n), sp.low.shape))
+        start += n
+    lows = np.concatenate([sp.low.ravel() for sp in action_space.spaces.values()])
+    highs = np.concatenate([sp.high.ravel() for sp in action_space.spaces.values()])
+    return layout, lows, highs
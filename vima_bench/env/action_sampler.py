@@ -0,0 +1,34 @@
+"""Buffered random action sampling shared by the demo scripts.
+
+``action_space.sample()`` walks the Dict space and allocates fresh arrays
+for every subspace on every call. ``make_action_sampler`` binds the bounds
+once and draws each sample into reused buffers via one
+``np.random.Generator``.
+"""
+import numpy as np
+
+
+def make_action_sampler(action_space, seed=None):
+    """Random Dict-action sampler that reuses preallocated buffers.
+
+    The returned dict and its arrays are reused across calls — copy if you
+    need to keep an action.
+    """
+    rng = np.random.default_rng(seed)
+    bufs = {}
+    parts = []
+    for k, sp in action_space.spaces.items():
+        buf = np.empty_like(sp.low)
+        bufs[k] = buf
+        parts.append((buf, sp.low, sp.high - sp.low))
+
+    def sample_into():
+        for buf, low, span in parts:
+            # dtype must match the buffer: VIMA's Boxes are float32 and
+            # Generator.random(out=...) rejects a dtype mismatch.
+            rng.random(out=buf, dtype=buf.dtype)
+            buf *= span
+            buf += low
+        return bufs
+
+    return sample_into
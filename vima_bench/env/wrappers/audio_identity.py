@@ -1,9 +1,90 @@
-import pybullet as p
+import threading
 import time
-import subprocess
+from collections import deque, namedtuple
+from collections.abc import MutableMapping
 from pathlib import Path
+from types import MappingProxyType
 import numpy as np
 
+from .audio_playback import AudioMixer
+from .contact_cache import ContactSnapshotCache
+
+# Bound on the retained event history so the per-step snapshot cost stays
+# flat. Long runs can exceed it, so track totals via the running
+# ``audio_event_count`` info field, not ``len(audio_events)``.
+_MAX_AUDIO_EVENTS = 256
+
+# Rows per pre-drawn embedding pool; resets slice from the pool so reset
+# latency is an O(n) copy rather than an O(n) RNG draw.
+_EMB_POOL_ROWS = 1024
+
+# One audio event. A namedtuple instead of a per-hit dict: no hash table
+# per event, smaller footprint, attribute access for consumers.
+AudioEvent = namedtuple(
+    "AudioEvent", ("step", "object_id", "sound", "other_body", "tool_touch")
+)
+
+
+class _LazyAudioInfo(MutableMapping):
+    """
+    Info dict returned by :meth:`AudioIdentityWrapper.step`.
+
+    Overlays the audio fields on the inner env's info dict without copying
+    it: an audio key is materialized from the wrapper's state on first read
+    and cached, so consumers that never touch e.g. ``audio_obj_emb`` pay
+    nothing for it. Writes (and anything an outer wrapper adds) land in the
+    overlay, leaving the inner env's dict untouched.
+    """
+
+    __slots__ = ("_base", "_wrapper", "_extra")
+
+    _AUDIO_KEYS = (
+        "audio_events",
+        "audio_event_count",
+        "audio_identity",
+        "audio_obj_emb",
+        "audio_emb_dim",
+    )
+
+    def __init__(self, base, wrapper):
+        self._base = base if base is not None else {}
+        self._wrapper = wrapper
+        self._extra = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._extra[key]
+        except KeyError:
+            pass
+        base = self._base
+        if key in base:
+            return base[key]
+        val = self._wrapper._audio_info_value(key)  # KeyError for unknown keys
+        self._extra[key] = val
+        return val
+
+    def __setitem__(self, key, value):
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        # overlay only; the base dict belongs to the inner env
+        del self._extra[key]
+
+    def __iter__(self):
+        seen = set(self._extra)
+        yield from self._extra
+        for k in self._base:
+            if k not in seen:
+                seen.add(k)
+                yield k
+        for k in self._AUDIO_KEYS:
+            if k not in seen:
+                yield k
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
 class AudioIdentityWrapper:
     """
     AudioIdentityWrapper (meaningful)
@@ -18,6 +99,38 @@ class AudioIdentityWrapper:
     - Optionally terminate if a SILENT object is touched by the tool.
     """
 
+    # Fixed attribute set: drops the per-instance __dict__ and keeps the
+    # hot-path attribute loads on the compact slots layout.
+    __slots__ = (
+        "env",
+        "object_sound_map",
+        "_sound_ids",
+        "cooldown",
+        "_cooldown_ns",
+        "debug",
+        "ignore_bodies",
+        "tool_bodies",
+        "terminate_on_silent_touch",
+        "silent_penalty",
+        "last_play_time",
+        "audio_events",
+        "_events_snapshot",
+        "_events_dirty",
+        "_event_count",
+        "step_count",
+        "emb_dim",
+        "rng",
+        "audio_obj_emb",
+        "_emb_info_cache",
+        "_identity_view",
+        "_emb_pool",
+        "_emb_cursor",
+        "_next_pool",
+        "_refill_thread",
+        "sound_bank",
+        "_mixer",
+        "_contacts",
+    )
 
     def __init__(
         self,
@@ -29,26 +142,46 @@ class AudioIdentityWrapper:
         tool_bodies=None,
         terminate_on_silent_touch=False,
         silent_penalty=-1.0,
+        contact_cache=None,
     ):
         self.env = env
         self.object_sound_map = object_sound_map
+        # Frozen mirror of the tagged ids; drives the per-body contact
+        # queries in step() and scalar membership checks.
+        self._sound_ids = frozenset(object_sound_map)
         self.cooldown = cooldown
+        # integer nanoseconds: cooldown checks become int compares against
+        # time.monotonic_ns(), immune to wall-clock jumps and with no float
+        # boxing on the per-contact path
+        self._cooldown_ns = int(cooldown * 1e9)
         self.debug = debug
 
-        self.ignore_bodies = set(ignore_bodies or [])
-        self.tool_bodies = set(tool_bodies or [])
+        self.ignore_bodies = frozenset(ignore_bodies or ())
+        self.tool_bodies = frozenset(tool_bodies or ())
 
         self.terminate_on_silent_touch = terminate_on_silent_touch
         self.silent_penalty = float(silent_penalty)
 
         self.last_play_time = {}
-        self.audio_events = []
+        self.audio_events = deque(maxlen=_MAX_AUDIO_EVENTS)
+        # tuple snapshot of the deque, rebuilt only when an event was appended
+        self._events_snapshot = ()
+        self._events_dirty = False
+        self._event_count = 0
         self.step_count = 0
 
         # audio embedding state (persistent per episode)
         self.emb_dim = 128
         self.rng = np.random.default_rng(42)
         self.audio_obj_emb = {}
+        self._emb_info_cache = {}
+        self._identity_view = MappingProxyType(self.object_sound_map)
+
+        # pre-drawn embedding pool state (see _take_embeddings)
+        self._emb_pool = None
+        self._emb_cursor = 0
+        self._next_pool = None
+        self._refill_thread = None
 
         base_dir = Path(__file__).resolve().parents[3]
         sound_dir = base_dir / "sounds"
@@ -59,118 +192,196 @@ class AudioIdentityWrapper:
             "alarm": str(sound_dir / "obj3.wav"),
             "impact": str(sound_dir / "hunk_hunk.wav"),
         }
+        # playback runs on a daemon thread so step() never forks a process
+        self._mixer = AudioMixer(self.sound_bank)
 
-    def reset(self):
+        # Pass the same cache to every wrapper in a stack so a physics step's
+        # contacts cross the FFI once, whoever reads them first.
+        self._contacts = contact_cache if contact_cache is not None else ContactSnapshotCache()
+
+    def _reset_audio_state(self):
         self.audio_events.clear()
+        self._events_snapshot = ()
+        self._events_dirty = False
         self.last_play_time.clear()
+        self._event_count = 0
         self.step_count = 0
 
-        # create persistent embeddings for this episode
-        self.audio_obj_emb = {}
-        for obj_id, label in self.object_sound_map.items():
-            if label is None:
-                continue
-            self.audio_obj_emb[obj_id] = self.rng.normal(
-                size=(self.emb_dim,)
-            ).astype("float32")
+        # create persistent embeddings for this episode — sliced from the
+        # pre-drawn pool, so the per-reset cost is a cursor bump rather than
+        # an RNG draw
+        labeled = [
+            obj_id for obj_id, label in self.object_sound_map.items()
+            if label is not None
+        ]
+        block = self._take_embeddings(len(labeled))
+        self.audio_obj_emb = {obj_id: block[i] for i, obj_id in enumerate(labeled)}
+
+        # Embeddings and the identity map are fixed for the episode, so the
+        # info payloads are built once here instead of per step (the tolist()
+        # alone boxed N*emb_dim floats every step).
+        self._emb_info_cache = {
+            k: v.tolist() for k, v in self.audio_obj_emb.items()
+        }
+        self._identity_view = MappingProxyType(self.object_sound_map)
+
+    def _take_embeddings(self, n):
+        """
+        Slice ``n`` fresh rows from the pre-drawn embedding pool. The pool is
+        refilled by a background thread once half of it is consumed, so over
+        many resets the RNG cost is amortized off the reset path.
+        """
+        if n == 0:
+            return np.empty((0, self.emb_dim), dtype=np.float32)
+        if self._emb_pool is None or self._emb_cursor + n > len(self._emb_pool):
+            self._swap_in_fresh_pool(n)
+        block = self._emb_pool[self._emb_cursor : self._emb_cursor + n]
+        self._emb_cursor += n
+        if self._emb_cursor * 2 >= len(self._emb_pool) and self._refill_thread is None:
+            self._refill_thread = threading.Thread(
+                target=self._draw_next_pool, daemon=True
+            )
+            self._refill_thread.start()
+        return block
+
+    def _draw_next_pool(self):
+        self._next_pool = self.rng.standard_normal(
+            (_EMB_POOL_ROWS, self.emb_dim), dtype=np.float32
+        )
+
+    def _swap_in_fresh_pool(self, n):
+        thread = self._refill_thread
+        if thread is not None:
+            thread.join()
+            self._refill_thread = None
+        pool, self._next_pool = self._next_pool, None
+        if pool is None or len(pool) < n:
+            pool = self.rng.standard_normal(
+                (max(_EMB_POOL_ROWS, n), self.emb_dim), dtype=np.float32
+            )
+        self._emb_pool = pool
+        self._emb_cursor = 0
+
+    def set_object_sound_map(self, object_sound_map, ignore_bodies=None, tool_bodies=None):
+        """
+        Rebind the per-episode sound map (and optionally the ignore/tool sets)
+        without resetting the base env. Lets callers reuse one wrapped env
+        across episodes: reset the base env, rescan bodies, then swap the map
+        here — body ids can change between resets.
+        """
+        self.object_sound_map = object_sound_map
+        self._sound_ids = frozenset(object_sound_map)
+        if ignore_bodies is not None:
+            self.ignore_bodies = frozenset(ignore_bodies)
+        if tool_bodies is not None:
+            self.tool_bodies = frozenset(tool_bodies)
+        self._reset_audio_state()
 
+    def reset(self):
+        self._contacts.invalidate()
+        self._reset_audio_state()
         return self.env.reset()
 
-    def _play(self, wav_path):
-        try:
-            subprocess.Popen(
-                ["play", "-q", wav_path],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-            )
-        except Exception:
-            pass
+    def _play(self, sound_label):
+        self._mixer.play(sound_label)
 
     def step(self, action):
+        self._contacts.invalidate()
         obs, reward, done, info = self.env.step(action)
         self.step_count += 1
 
-        now = time.time()
-        cps = p.getContactPoints()
+        now = time.monotonic_ns()
+
+        # Kernel-side filter: one getContactPoints(bodyA=oid) per tagged body
+        # instead of enumerating every contact in the scene and masking it
+        # down in Python — pybullet does the filtering in C++ and only the
+        # relevant rows cross the FFI. Queries go through the shared snapshot
+        # cache, so a stacked wrapper asking about the same body this step
+        # gets the memoized rows. Pairs are deduped so a multi-point contact
+        # manifold fires its event once.
+        contacts = self._contacts
+        hits = []
+        seen = set()
+        for oid in self._sound_ids:
+            for cp in contacts.get(oid):
+                key = (oid, cp[2])
+                if key not in seen:
+                    seen.add(key)
+                    hits.append(key)
 
         # optional debug
-        if self.debug and self.step_count % 30 == 0 and cps:
-            pairs = set((cp[1], cp[2]) for cp in cps)
-            print(f"[DEBUG] step={self.step_count} contact pairs(sample)={list(pairs)[:10]}")
+        if self.debug and self.step_count % 30 == 0 and hits:
+            print(f"[DEBUG] step={self.step_count} contact pairs(sample)={hits[:10]}")
 
         # track if we touched silent object with the tool
         silent_violation = False
 
-        for cp in cps:
-            body_a = cp[1]
-            body_b = cp[2]
-
+        for hit_id, other_id in hits:
             # ignore plane/workspace/ur5/lines contacts entirely
-            if body_a in self.ignore_bodies or body_b in self.ignore_bodies:
+            if other_id in self.ignore_bodies:
                 continue
 
-            # determine if one side is tagged object
-            for hit_id, other_id in ((body_a, body_b), (body_b, body_a)):
-                if hit_id not in self.object_sound_map:
-                    continue
-
-                # We only care if interaction is with tool OR another object (not ignored)
-                tool_touch = (other_id in self.tool_bodies)
-                object_touch = (other_id not in self.ignore_bodies)
+            # The per-body query already guarantees hit_id is tagged, and the
+            # other side is either the tool or a non-ignored object.
+            tool_touch = (other_id in self.tool_bodies)
 
-                # if you want only tool contacts, comment out object_touch line and require tool_touch
-                if not (tool_touch or object_touch):
-                    continue
+            sound_label = self.object_sound_map[hit_id]
 
-                sound_label = self.object_sound_map[hit_id]
+            # If silent object touched by tool -> violation
+            if sound_label is None and tool_touch:
+                silent_violation = True
+                continue
 
-                # If silent object touched by tool -> violation
-                if sound_label is None and tool_touch:
-                    silent_violation = True
-                    continue
+            if sound_label is None:
+                continue  # silent objects make no sound
 
-                if sound_label is None:
-                    continue  # silent objects make no sound
+            last = self.last_play_time.get(hit_id, 0)
+            if now - last < self._cooldown_ns:
+                continue
 
-                last = self.last_play_time.get(hit_id, 0.0)
-                if now - last < self.cooldown:
-                    continue
+            if sound_label in self.sound_bank:
+                self._play(sound_label)
 
-                wav = self.sound_bank.get(sound_label)
-                if wav:
-                    self._play(wav)
+            self.audio_events.append(
+                AudioEvent(self.step_count, hit_id, sound_label, other_id, tool_touch)
+            )
+            self._event_count += 1
+            self._events_dirty = True
+            self.last_play_time[hit_id] = now
 
-                self.audio_events.append(
-                    {
-                        "step": self.step_count,
-                        "object_id": hit_id,
-                        "sound": sound_label,
-                        "other_body": other_id,
-                        "tool_touch": tool_touch,
-                    }
-                )
-                self.last_play_time[hit_id] = now
+        # Lazy overlay instead of a copy: the audio fields below only get
+        # materialized if a consumer reads them, and writes never touch the
+        # inner env's dict.
+        info = _LazyAudioInfo(info, self)
 
         # enforce rule: touching silent objects ends episode
         if self.terminate_on_silent_touch and silent_violation and not done:
             done = True
             reward = self.silent_penalty
-            info = dict(info)
             info["terminated_reason"] = "touched_silent_object_with_tool"
 
-        # ------------------------------------------------
-        # expose audio information to agent (EVERY step)
-        # ------------------------------------------------
-        info = dict(info) if info is not None else {}
-        info["audio_events"] = list(self.audio_events)
-        info["audio_identity"] = dict(self.object_sound_map)
-        info["audio_obj_emb"] = {
-            k: v.tolist() for k, v in self.audio_obj_emb.items()
-        }
-        info["audio_emb_dim"] = self.emb_dim
-
         return obs, reward, done, info
 
+    def _audio_info_value(self, key):
+        """Resolve one audio info field for :class:`_LazyAudioInfo`."""
+        if key == "audio_events":
+            # O(1) on quiet steps: the tuple snapshot is only rebuilt after
+            # an append, instead of copying the whole history every read.
+            if self._events_dirty:
+                self._events_snapshot = tuple(self.audio_events)
+                self._events_dirty = False
+            return self._events_snapshot
+        if key == "audio_event_count":
+            # Plain running int so consumers don't have to touch the event
+            # list just to count events.
+            return self._event_count
+        if key == "audio_identity":
+            return self._identity_view
+        if key == "audio_obj_emb":
+            return self._emb_info_cache
+        if key == "audio_emb_dim":
+            return self.emb_dim
+        raise KeyError(key)
 
     def close(self):
         self.env.close()
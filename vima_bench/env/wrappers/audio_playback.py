@@ -0,0 +1,88 @@
+"""Background audio playback shared by the audio wrappers.
+
+Playback used to fork a ``play``/``powershell.exe`` process from inside
+``env.step()`` for every event; process spawn costs tens of milliseconds
+and lands directly on the simulation hot path. ``AudioMixer`` instead
+services playback requests from a queue on a daemon thread, so ``step()``
+only pays for a ``put_nowait``. When the optional ``soundfile`` /
+``sounddevice`` packages are available the WAVs are decoded once up front
+and played in-process; otherwise the worker thread falls back to spawning
+the external player — still off the hot path.
+"""
+import queue
+import subprocess
+import threading
+
+try:
+    import sounddevice as _sd
+    import soundfile as _sf
+except ImportError:  # optional audio deps; fall back to subprocess playback
+    _sd = None
+    _sf = None
+
+
+class AudioMixer:
+    """
+    Non-blocking, fire-and-forget WAV playback.
+
+    sound_bank: mapping of label -> wav path.
+    spawn: optional callable(path) used as the playback fallback when
+        in-process audio is unavailable; defaults to SoX ``play -q``.
+    """
+
+    def __init__(self, sound_bank, spawn=None):
+        self._sound_bank = dict(sound_bank)
+        self._spawn = spawn or self._spawn_play
+        self._wav_cache = {}
+        self._queue = queue.Queue(maxsize=64)
+        self._thread = None
+
+    def play(self, label):
+        """Enqueue playback for ``label``; never blocks the caller."""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(label)
+        except queue.Full:
+            pass  # drop the event rather than stall env.step()
+
+    # ------------------------------------------------------------------
+    # worker side
+    # ------------------------------------------------------------------
+    def _start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="audio-mixer", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        if _sf is not None:
+            # Decode every WAV once, here on the worker thread — the first
+            # play() arrives from inside env.step() and must stay a bare
+            # put_nowait, not a synchronous decode of the whole bank.
+            for label, path in self._sound_bank.items():
+                try:
+                    self._wav_cache[label] = _sf.read(path, dtype="float32")
+                except Exception:
+                    pass
+        while True:
+            label = self._queue.get()
+            try:
+                cached = self._wav_cache.get(label)
+                if cached is not None and _sd is not None:
+                    data, samplerate = cached
+                    _sd.play(data, samplerate)
+                else:
+                    path = self._sound_bank.get(label)
+                    if path:
+                        self._spawn(path)
+            except Exception:
+                pass
+
+    @staticmethod
+    def _spawn_play(path):
+        subprocess.Popen(
+            ["play", "-q", path],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
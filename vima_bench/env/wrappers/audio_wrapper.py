@@ -4,6 +4,9 @@ from pathlib import Path
 import pybullet as p
 import gym
 
+from .audio_playback import AudioMixer
+from .contact_cache import ContactSnapshotCache
+
 
 class AudioWrapper(gym.Wrapper):
     """
@@ -12,41 +15,95 @@ class AudioWrapper(gym.Wrapper):
     - When any contact involves one of those bodies, play its assigned WAV.
     """
 
-    def __init__(self, env, wav_paths=None, cooldown_sec=0.20, verbose=True):
+    def __init__(self, env, wav_paths=None, cooldown_sec=0.20, verbose=True,
+                 static_ids=None, contact_cache=None):
         super().__init__(env)
         self.cooldown_sec = cooldown_sec
         self.verbose = verbose
 
+        # Pass the same cache to every wrapper in a stack so a physics step's
+        # contacts cross the FFI once, whoever reads them first.
+        self._contacts = contact_cache if contact_cache is not None else ContactSnapshotCache()
+
         # WAV files (must exist)
         if wav_paths is None:
             wav_paths = ["sounds/obj1.wav", "sounds/obj2.wav", "sounds/obj3.wav"]
         self.wav_paths = [str(Path(w)) for w in wav_paths]
 
+        # Caller-supplied body ids skip static-body detection entirely; for
+        # known fixed scenes that removes every per-body pybullet round-trip
+        # from reset().
+        self._pinned_static_ids = list(static_ids) if static_ids is not None else None
+
         self.static_ids = []            # 3 chosen stationary body ids
         self.sound_by_id = {}           # body_id -> wav_path
         self._last_play = {}            # body_id -> time
 
-    def _play_wav(self, wav_path):
-        try:
-            # Convert WSL path to Windows path so PowerShell can read it
+        # scene signature -> cached selection; resets that preserve the scene
+        # graph skip the per-body getDynamicsInfo/getBodyInfo enumeration
+        self._last_sig = None
+        self._cached_chosen = None
+
+        # bound on first step once the gym API (4- vs 5-tuple) is known
+        self._step_impl = None
+
+        # playback runs on a daemon thread so step() never forks a process;
+        # the WSL/PowerShell spawn below is only the fallback when in-process
+        # audio is unavailable
+        self._win_paths = {}            # wav_path -> cached Windows path
+        self._mixer = AudioMixer(
+            {w: w for w in self.wav_paths}, spawn=self._spawn_powershell
+        )
+
+    def _spawn_powershell(self, wav_path):
+        # Convert WSL path to Windows path so PowerShell can read it. The
+        # translation is static per path, so the wslpath fork/exec runs once
+        # per file instead of once per playback. Lazy (rather than eager in
+        # __init__) so non-WSL hosts that never hit this fallback don't fork
+        # wslpath at construction.
+        win_path = self._win_paths.get(wav_path)
+        if win_path is None:
             win_path = subprocess.check_output(["wslpath", "-w", str(wav_path)]).decode().strip()
-            subprocess.Popen(
-                [
-                    "powershell.exe",
-                    "-NoProfile",
-                    "-Command",
-                    f"(New-Object Media.SoundPlayer '{win_path}').Play();"
-                ],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-           )
-        except Exception:
-            pass
+            self._win_paths[wav_path] = win_path
+        subprocess.Popen(
+            [
+                "powershell.exe",
+                "-NoProfile",
+                "-Command",
+                f"(New-Object Media.SoundPlayer '{win_path}').Play();"
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _play_wav(self, wav_path):
+        self._mixer.play(wav_path)
 
     def _choose_three_stationary_bodies(self):
+        # Pinned ids bypass detection altogether.
+        if self._pinned_static_ids is not None:
+            self.static_ids = list(self._pinned_static_ids)
+            self.sound_by_id = {
+                bid: self.wav_paths[i % len(self.wav_paths)]
+                for i, bid in enumerate(self.static_ids)
+            }
+            for bid in self.static_ids:
+                self._last_play[bid] = 0.0
+            return
+
+        # One-call signature (body count); when it matches the previous
+        # reset, the static set is identical and the enumeration is skipped.
+        sig = nb = p.getNumBodies()
+        if sig == self._last_sig and self._cached_chosen is not None:
+            chosen = self._cached_chosen
+            self.static_ids = [bid for bid, _ in chosen]
+            for bid in self.static_ids:
+                self._last_play[bid] = 0.0
+            return
+
         # Find static bodies (base mass == 0). Exclude the ground plane if possible.
         static = []
-        for bid in range(p.getNumBodies()):
+        for bid in range(nb):
             mass = p.getDynamicsInfo(bid, -1)[0]
             if mass == 0:
                 name = p.getBodyInfo(bid)[1].decode("utf-8", errors="ignore")
@@ -65,6 +122,8 @@ class AudioWrapper(gym.Wrapper):
 
         # Keep first 3 unique
         chosen = candidates[:3]
+        self._last_sig = sig
+        self._cached_chosen = chosen
         self.static_ids = [bid for bid, _ in chosen]
 
         # Map each id -> sound
@@ -79,6 +138,7 @@ class AudioWrapper(gym.Wrapper):
                 print(f"  - id={bid} name={name} -> {self.sound_by_id[bid]}")
 
     def reset(self, **kwargs):
+        self._contacts.invalidate()
         out = self.env.reset(**kwargs)
 
         # Every reset, re-detect static objects (IDs can change between resets)
@@ -86,38 +146,53 @@ class AudioWrapper(gym.Wrapper):
         return out
 
     def step(self, action):
-        out = self.env.step(action)
-
-        # Support old/new gym API
-        if isinstance(out, tuple) and len(out) == 4:
-            obs, reward, done, info = out
-            terminated, truncated = done, False
-        else:
-            obs, reward, terminated, truncated, info = out
+        # Support old/new gym API: the tuple arity is a property of the env,
+        # not of the step, so detect it once on the first call and pin the
+        # matching unpack — later steps skip the isinstance/len reflection.
+        impl = self._step_impl
+        if impl is None:
+            self._contacts.invalidate()
+            out = self.env.step(action)
+            impl = self._step_gym4 if len(out) == 4 else self._step_gym5
+            self._step_impl = impl
+            self._on_stepped()
+            return out
+        return impl(action)
+
+    def _step_gym4(self, action):
+        self._contacts.invalidate()
+        obs, reward, done, info = self.env.step(action)
+        self._on_stepped()
+        return obs, reward, done, info
+
+    def _step_gym5(self, action):
+        self._contacts.invalidate()
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self._on_stepped()
+        return obs, reward, terminated, truncated, info
 
-        # Play sound if contact involves any of the 3 stationary ids
+    def _on_stepped(self):
+        # Play sound if contact involves any of the 3 stationary ids. Reads
+        # go through the shared snapshot cache (invalidated just before the
+        # step), so a stacked wrapper asking about the same bodies this step
+        # reuses the rows instead of re-querying pybullet.
         try:
             now = time.time()
-            for cp in cps:
-                bodyA = cp[1]
-                bodyB = cp[2]
-
-                # If either body is one of our stationary objects
-                hit_id = None
-                if bodyA in self.sound_by_id:
-                    hit_id = bodyA
-                elif bodyB in self.sound_by_id:
-                    hit_id = bodyB
-
-                if hit_id is not None:
+            contacts = self._contacts
+            # One body pair can show up with several contact points (edge
+            # and vertex manifolds); process each pair once per step.
+            seen = set()
+            for hit_id in self.static_ids:
+                for cp in contacts.get(hit_id):
+                    key = (hit_id, cp[2])
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
                     if now - self._last_play[hit_id] >= self.cooldown_sec:
                         self._last_play[hit_id] = now
                         if self.verbose:
-                           print(f"[AUDIO] Contact -> id={hit_id} wav={self.sound_by_id[hit_id]}") 
+                            print(f"[AUDIO] Contact -> id={hit_id} wav={self.sound_by_id[hit_id]}")
                         self._play_wav(self.sound_by_id[hit_id])
         except Exception:
             pass
-
-        if len(out) == 4:
-            return obs, reward, terminated, info
-        return obs, reward, terminated, truncated, info
@@ -0,0 +1,47 @@
+"""Shared per-step contact snapshot for the audio wrappers.
+
+When audio wrappers are stacked, each one needs the contact points of the
+physics step it just advanced; querying pybullet independently repeats the
+FFI round-trip for identical data. ``ContactSnapshotCache`` memoizes
+``getContactPoints`` results per query key until invalidated, so wrappers
+that share one cache instance pay for each query once per step.
+"""
+import pybullet as p
+
+
+class ContactSnapshotCache:
+    """
+    Memoized view of ``p.getContactPoints`` for the current physics step.
+
+    Usage: call :meth:`invalidate` immediately before advancing the
+    simulation, then read contacts through :meth:`get`; repeated reads of
+    the same key within the step are served from the cache.
+    """
+
+    __slots__ = ("_snapshots",)
+
+    def __init__(self):
+        self._snapshots = {}
+
+    def invalidate(self):
+        """Drop memoized results; the next read re-queries pybullet."""
+        self._snapshots.clear()
+
+    def get(self, body_a=None):
+        """
+        Contact points for the current step, memoized per query key.
+
+        ``body_a=None`` returns the full scene snapshot; passing a body id
+        restricts the query to contacts involving that body (filtered on
+        the pybullet side).
+        """
+        try:
+            return self._snapshots[body_a]
+        except KeyError:
+            pass
+        if body_a is None:
+            snap = p.getContactPoints()
+        else:
+            snap = p.getContactPoints(bodyA=body_a)
+        self._snapshots[body_a] = snap
+        return snap